@@ -0,0 +1,102 @@
+"""Latencia del event loop con logging intenso.
+
+Varias corrutinas escriben logs sin parar mientras otra mide cuánto se retrasa
+un asyncio.sleep() corto. Se compara el pipeline de la app (cola + hilo) con un
+StreamHandler síncrono, ambos escribiendo a un stream lento que simula un pipe
+saturado:
+
+    python bench/log_loop_lag.py --records 50000 --write-delay 0.0002
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import sys
+import time
+import warnings
+from logging.handlers import QueueListener
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+warnings.simplefilter("ignore")
+
+from f_api.main import BoundedQueueHandler, JsonFormatter  # noqa: E402
+
+TICK = 0.001
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, data):
+        time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+async def measure(logger: logging.Logger, records: int, writers: int) -> list[float]:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    async def writer(n: int):
+        for i in range(n):
+            logger.info("request %d", i, extra={"fields": {"status_code": 200}})
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.gather(*(writer(records // writers) for _ in range(writers)))
+    done.set()
+    await tick
+    return sorted(lags)
+
+
+def run(name: str, handler: logging.Handler, args) -> None:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    start = time.perf_counter()
+    lags = asyncio.run(measure(logger, args.records, args.writers))
+    elapsed = time.perf_counter() - start
+    dropped = getattr(handler, "dropped", 0)
+    pct = lambda p: lags[min(int(len(lags) * p), len(lags) - 1)] * 1000  # noqa: E731
+    print(f"{name:<8} {pct(0.5):>9.3f} {pct(0.99):>9.3f} {lags[-1] * 1000:>9.3f} {elapsed:>8.2f} {dropped:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--write-delay", type=float, default=0.0002, help="segundos por write del stream lento")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--policy", choices=["drop", "block"], default="drop")
+    args = parser.parse_args()
+
+    print(f"{'handler':<8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total s':>8} {'dropped':>8}")
+
+    direct = logging.StreamHandler(SlowStream(args.write_delay))
+    direct.setFormatter(JsonFormatter())
+    run("direct", direct, args)
+
+    output = logging.StreamHandler(SlowStream(args.write_delay))
+    output.setFormatter(JsonFormatter())
+    queued = BoundedQueueHandler(queue.Queue(maxsize=args.queue_size), block=args.policy == "block")
+    listener = QueueListener(queued.queue, output)
+    listener.start()
+    try:
+        run("queued", queued, args)
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
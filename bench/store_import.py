@@ -0,0 +1,63 @@
+"""Benchmark de /store/export y /store/import en todos los formatos.
+
+Corre contra una base de datos de test temporal en disco, así que no toca db.sqlite3:
+
+    python bench/store_import.py --rows 200000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+warnings.simplefilter("ignore")
+
+from django.db import connection  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from f_api.main import StoreFormat, app, insert_rows, pa  # noqa: E402
+from store.models import Item  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    if connection.vendor == "sqlite":
+        # por defecto la base de test de SQLite vive en memoria; se pasa a un archivo
+        connection.settings_dict["TEST"]["NAME"] = str(Path(tmp_dir.name) / "bench.sqlite3")
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        client = TestClient(app)
+        formats = [f for f in StoreFormat if pa is not None or f in (StoreFormat.csv, StoreFormat.ndjson)]
+        print(f"{'format':<8} {'export rows/s':>14} {'import rows/s':>14} {'size MB':>8}")
+        for store_format in formats:
+            Item.objects.all().delete()
+            insert_rows([(f"item {i}", "descripción de prueba", i % 1000, 0.19) for i in range(args.rows)])
+
+            start = perf_counter()
+            exported = client.get("/store/export", params={"format": store_format.value}).content
+            export_rate = args.rows / (perf_counter() - start)
+
+            Item.objects.all().delete()
+            start = perf_counter()
+            response = client.post(
+                "/store/import", params={"format": store_format.value}, files={"file": ("f", exported)}
+            )
+            import_rate = args.rows / (perf_counter() - start)
+            summary = json.loads(response.text.splitlines()[-1])
+            assert summary == {**summary, "status": "done", "imported": args.rows}, response.text
+
+            print(f"{store_format.value:<8} {export_rate:>14,.0f} {import_rate:>14,.0f} {len(exported) / 1e6:>8.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, Path, Query, Body, Cookie, Header, Response
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import FastAPI, Path, Query, Body, Cookie, Header, Response, File, UploadFile, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from enum import Enum
 from typing import Any, Optional, List, Union
-from pydantic import BaseModel, Field, HttpUrl, EmailStr
+from pydantic import BaseModel, Field, HttpUrl, EmailStr, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
 import os
 import django
 from fastapi import HTTPException
@@ -11,6 +13,20 @@ from typing import Annotated, Literal
 import random
 from datetime import datetime, time, timedelta
 from uuid import UUID
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import unquote, urlencode
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import atexit
+import copy
+import logging
+import queue
+import sys
+from time import perf_counter
+import csv
+import io
+import json
 
 # --- CONFIGURACIÓN DE DJANGO ---
 # Es crucial que esto se ejecute antes de importar los modelos
@@ -19,10 +35,168 @@ django.setup()
 
 # --- IMPORTACIONES DE DJANGO (después de django.setup()) ---
 from store.models import Item as DjangoItem # Usamos un alias para evitar conflictos de nombres
+from django.db import DatabaseError, connection, connections, transaction
+
+# pyarrow es opcional: solo se necesita para exportar/importar en Parquet o Arrow
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pq = None
 
 
 app = FastAPI()
 
+# ---------- LOGGING ----------
+# Los handlers solo encolan el registro; un hilo aparte (QueueListener) lo
+# convierte a JSON y lo escribe, así un stdout lento no bloquea el event loop.
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.environ.get("LOG_QUEUE_POLICY", "drop")  # "drop" o "block" cuando la cola está llena
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    # "/items/{item_id}=0.1,/models/{model_name}=0.5" -> {"/items/{item_id}": 0.1, ...}
+    rates = {}
+    for entry in value.split(","):
+        route, _, rate = entry.strip().rpartition("=")
+        if route:
+            rates[route] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+# muestreo del access log por plantilla de ruta; las rutas que no aparecen se registran siempre
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", ""))
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue, block: bool = False):
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+
+    def prepare(self, record):
+        # solo se resuelve el mensaje; el JSON se arma en el hilo del listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put(record, block=self.block)
+        except queue.Full:
+            self.dropped += 1
+
+
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+log_handler = BoundedQueueHandler(log_queue, block=LOG_QUEUE_POLICY == "block")
+log_output = logging.StreamHandler(sys.stdout)
+log_output.setFormatter(JsonFormatter())
+log_listener = QueueListener(log_queue, log_output)
+log_listener.start()
+
+
+def stop_logging():
+    log_listener.stop()
+    # la cola ya está vacía y sin hilo: el aviso se escribe directo
+    if log_handler.dropped:
+        log_output.handle(logging.makeLogRecord({
+            "name": "f_api",
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": "log records dropped",
+            "fields": {"dropped": log_handler.dropped},
+        }))
+
+
+atexit.register(stop_logging)
+
+logger = logging.getLogger("f_api")
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(log_handler)
+logger.propagate = False
+access_logger = logger.getChild("access")
+
+
+def should_log_access(route_path: str, status_code: int) -> bool:
+    # los errores del servidor nunca se muestrean
+    rate = LOG_SAMPLE_RATES.get(route_path, 1.0)
+    return status_code >= 500 or rate >= 1.0 or random.random() < rate
+
+
+class AccessLogMiddleware:
+    """Middleware ASGI puro: registra cada request cuando termina de enviarse el cuerpo."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        status_code = None
+        logged = False
+
+        def log(status: int):
+            nonlocal logged
+            logged = True
+            route = scope.get("route")
+            route_path = route.path if route is not None else scope["path"]
+            if should_log_access(route_path, status):
+                access_logger.info(
+                    "request",
+                    extra={"fields": {
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route_path,
+                        "status_code": status,
+                        "duration_ms": round((perf_counter() - start) * 1000, 3),
+                        "client": scope["client"][0] if scope.get("client") else None,
+                    }},
+                )
+
+        async def send_and_log(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                log(status_code)
+
+        try:
+            await self.app(scope, receive, send_and_log)
+        except Exception:
+            # sin respuesta o con el cuerpo cortado a la mitad: no se registra como éxito
+            if not logged:
+                log(500)
+            raise
+
+
+app.add_middleware(AccessLogMiddleware)
+
 # ---------- RUTAS BÁSICAS ----------
 @app.get("/")
 async def root():
@@ -101,6 +275,312 @@ def read_all_items():
     items = DjangoItem.objects.all()
     return list(items)
 
+# ---------- EXPORT / IMPORT MASIVO ----------
+# Tienen que ir antes de /store/{item_id}, si no "export" se toma como item_id.
+
+STORE_FIELDS = ["id", "name", "description", "price", "tax"]
+STORE_BATCH_SIZE = 5000
+
+
+class StoreFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+STORE_MEDIA_TYPES = {
+    StoreFormat.csv: "text/csv",
+    StoreFormat.ndjson: "application/x-ndjson",
+    StoreFormat.parquet: "application/vnd.apache.parquet",
+    StoreFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+
+
+def chunked(rows, size: int = STORE_BATCH_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def require_pyarrow(store_format: StoreFormat):
+    if store_format in (StoreFormat.parquet, StoreFormat.arrow) and pa is None:
+        raise HTTPException(status_code=501, detail=f"pyarrow is required for {store_format.value}")
+
+
+def iter_store_rows():
+    # .iterator() usa un cursor del lado del servidor y no guarda la cache del queryset
+    return (
+        DjangoItem.objects.order_by("pk")
+        .values_list(*STORE_FIELDS)
+        .iterator(chunk_size=STORE_BATCH_SIZE)
+    )
+
+
+def store_arrow_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("price", pa.float64()),
+        ("tax", pa.float64()),
+    ])
+
+
+def export_csv():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STORE_FIELDS)
+    for chunk in chunked(iter_store_rows()):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # tabla vacía: solo la cabecera
+        yield buffer.getvalue().encode()
+
+
+def export_ndjson():
+    for chunk in chunked(iter_store_rows()):
+        yield "".join(json.dumps(dict(zip(STORE_FIELDS, row))) + "\n" for row in chunk).encode()
+
+
+def export_arrow(store_format: StoreFormat):
+    schema = store_arrow_schema()
+    sink = io.BytesIO()
+    if store_format is StoreFormat.parquet:
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    # cada lote se escribe (un row group en Parquet) y se vacía el buffer
+    for chunk in chunked(iter_store_rows()):
+        columns = list(zip(*chunk))
+        writer.write_batch(pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+
+def close_export(body):
+    body.close()
+    connections.close_all()  # solo cierra las conexiones de este hilo
+
+
+async def iterate_in_dedicated_thread(body):
+    # Starlette corre cada next() de un generador síncrono en cualquier hilo del pool, pero
+    # el cursor de .iterator() pertenece a la conexión de un hilo: todo el export se lee
+    # en un único hilo propio, que al final cierra su conexión
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-export")
+    loop = asyncio.get_running_loop()
+    try:
+        while (chunk := await loop.run_in_executor(executor, next, body, None)) is not None:
+            yield chunk
+    finally:
+        await loop.run_in_executor(executor, close_export, body)
+        executor.shutdown(wait=False)
+
+
+@app.get("/store/export")
+def export_items(format: StoreFormat = StoreFormat.csv):
+    require_pyarrow(format)
+    if format is StoreFormat.csv:
+        body = export_csv()
+    elif format is StoreFormat.ndjson:
+        body = export_ndjson()
+    else:
+        body = export_arrow(format)
+    return StreamingResponse(
+        iterate_in_dedicated_thread(body),
+        media_type=STORE_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="store_item.{format.value}"'},
+    )
+
+
+IMPORT_FIELDS = ["name", "description", "price", "tax"]
+NAME_MAX_LENGTH = DjangoItem._meta.get_field("name").max_length
+
+
+# Los campos de ItemSchemaIn con las restricciones de la tabla (largo de name, sin NaN,
+# que se guardaría como NULL), como TypedDict: validar un lote entero con TypeAdapter
+# es varias veces más rápido que crear un modelo por fila.
+class ItemRowIn(TypedDict):
+    name: Annotated[str, Field(max_length=NAME_MAX_LENGTH)]
+    description: NotRequired[Optional[str]]
+    price: Annotated[float, Field(allow_inf_nan=False)]
+    tax: Annotated[float, Field(allow_inf_nan=False)]
+
+
+item_rows_adapter = TypeAdapter(list[ItemRowIn])
+
+
+class StoreImportError(Exception):
+    def __init__(self, row: int, error: str):
+        super().__init__(error)
+        self.row = row
+        self.imported = 0
+
+
+def validate_rows(rows: list[dict], first_row: int):
+    try:
+        items = item_rows_adapter.validate_python(rows)
+    except ValidationError as exc:
+        error = exc.errors()[0]  # loc = (índice en el lote, campo)
+        raise StoreImportError(first_row + error["loc"][0], f"{error['loc'][-1]}: {error['msg']}")
+    return [(item["name"], item.get("description"), item["price"], item["tax"]) for item in items]
+
+
+def read_text_rows(source, store_format: StoreFormat):
+    if store_format is StoreFormat.csv:
+        text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+        for row in csv.DictReader(text):
+            row["description"] = row.get("description") or None
+            yield row
+    else:
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+def check_column(name: str, column, first_row: int):
+    # mismas reglas que ItemRowIn, pero sobre la columna entera
+    if name == "description":
+        return
+    if name == "name":
+        valid = pc.and_kleene(column.is_valid(), pc.less_equal(pc.utf8_length(column), NAME_MAX_LENGTH))
+        message = f"String should have at most {NAME_MAX_LENGTH} characters"
+    else:
+        valid = pc.and_kleene(column.is_valid(), pc.is_finite(column))
+        message = "Input should be a finite number"
+    bad_row = pc.index(valid, False).as_py()
+    if bad_row >= 0:
+        if not column[bad_row].is_valid:
+            message = "Field required"
+        raise StoreImportError(first_row + bad_row, f"{name}: {message}")
+
+
+def read_columnar_batches(source, store_format: StoreFormat):
+    # Parquet/Arrow ya vienen tipados: se castea cada columna y se valida con pyarrow.compute
+    schema = store_arrow_schema()
+    first_row = 1
+    try:
+        if store_format is StoreFormat.parquet:
+            parquet_file = pq.ParquetFile(source)
+            present = set(parquet_file.schema_arrow.names)
+            batches = parquet_file.iter_batches(
+                batch_size=STORE_BATCH_SIZE, columns=[name for name in IMPORT_FIELDS if name in present]
+            )
+        else:
+            batches = pa.ipc.open_stream(source)
+        for batch in batches:
+            columns = []
+            for name in IMPORT_FIELDS:
+                field_type = schema.field(name).type
+                if name in batch.schema.names:
+                    column = batch.column(name).cast(field_type)
+                elif name == "description":  # opcional, como en ItemSchemaIn
+                    column = pa.nulls(batch.num_rows, field_type)
+                else:
+                    raise StoreImportError(first_row, f"{name}: Field required")
+                check_column(name, column, first_row)
+                columns.append(column)
+            yield list(zip(*(column.to_pylist() for column in columns)))
+            first_row += batch.num_rows
+    except (ValueError, pa.ArrowException) as exc:
+        raise StoreImportError(first_row, str(exc))
+
+
+def read_import_batches(source, store_format: StoreFormat):
+    if store_format in (StoreFormat.parquet, StoreFormat.arrow):
+        yield from read_columnar_batches(source, store_format)
+        return
+    rows = read_text_rows(source, store_format)
+    first_row = 1
+    while True:
+        chunk = []
+        try:
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == STORE_BATCH_SIZE:
+                    break
+        except (ValueError, csv.Error) as exc:  # JSON o UTF-8 inválido, CSV mal formado
+            raise StoreImportError(first_row + len(chunk), str(exc))
+        if not chunk:
+            return
+        yield validate_rows(chunk, first_row)
+        first_row += len(chunk)
+
+
+def insert_rows(rows: list[tuple]):
+    # executemany directo: bulk_create arma un objeto del modelo por fila y es el cuello de botella
+    table = connection.ops.quote_name(DjangoItem._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(name) for name in IMPORT_FIELDS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s)", rows)
+
+
+def import_steps(source, store_format: StoreFormat):
+    # un paso por lote guardado (cada uno en su propia transacción) y al final el resumen;
+    # el id del archivo se ignora y la base de datos asigna uno nuevo
+    start = perf_counter()
+    imported = 0
+    batches = 0
+    try:
+        for rows in read_import_batches(source, store_format):
+            try:
+                insert_rows(rows)
+            except DatabaseError as exc:  # el lote falla entero: se reporta su primera fila
+                raise StoreImportError(imported + 1, str(exc))
+            imported += len(rows)
+            batches += 1
+            progress = {
+                "status": "progress",
+                "batch": batches,
+                "imported": imported,
+                "rows_per_second": round(imported / (perf_counter() - start)),
+            }
+            logger.info("store import batch", extra={"fields": progress})
+            yield progress
+    except StoreImportError as exc:
+        exc.imported = imported
+        raise
+    elapsed = perf_counter() - start
+    yield {
+        "status": "done",
+        "imported": imported,
+        "batches": batches,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(imported / elapsed) if elapsed else None,
+    }
+
+
+def import_error(exc: StoreImportError):
+    return {"row": exc.row, "imported": exc.imported, "error": str(exc)}
+
+
+@app.post("/store/import")
+def import_items(file: UploadFile = File(...), format: StoreFormat = StoreFormat.csv):
+    require_pyarrow(format)
+    steps = import_steps(file.file, format)
+    # el primer lote se procesa antes de responder: un archivo inválido desde el
+    # principio sigue dando 422; los errores posteriores llegan como última línea
+    try:
+        first = next(steps)
+    except StoreImportError as exc:
+        raise HTTPException(status_code=422, detail=import_error(exc))
+
+    def progress_lines():
+        yield json.dumps(first) + "\n"
+        try:
+            for step in steps:
+                yield json.dumps(step) + "\n"
+        except StoreImportError as exc:
+            logger.warning("store import failed", extra={"fields": import_error(exc)})
+            yield json.dumps({"status": "error", **import_error(exc)}) + "\n"
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
 # ---- READ (Single Item) ----
 @app.get("/store/{item_id}", response_model=ItemSchemaOut)#response model para que devuelva la estrutura que quiero
 def read_single_item(item_id: int):    
@@ -413,7 +893,7 @@ def fake_password_hasher(raw_password: str):
 def fake_save_user(user_in: UserInMultiples):
     hashed_password = fake_password_hasher(user_in.password)
     user_in_db = UserInDBMultiples(**user_in.dict(), hashed_password=hashed_password)
-    print("User saved! ..not really")
+    logger.info("User saved! ..not really", extra={"fields": {"username": user_in.username}})
     return user_in_db
 
 
@@ -449,7 +929,7 @@ def fake_password_hasher(raw_password: str):
 def fake_save_user(user_in: UserInReduce):
     hashed_password = fake_password_hasher(user_in.password)
     user_in_db = UserInDBReduce(**user_in.dict(), hashed_password=hashed_password)
-    print("User saved! ..not really")
+    logger.info("User saved! ..not really", extra={"fields": {"username": user_in.username}})
     return user_in_db
 
 
@@ -498,4 +978,136 @@ async def create_item(name: str):
     300 - 399 son para "Redirección".
     400 - 499 son para "Errores del cliente".
     500 - 599 son para "Errores del servidor".
-    """
\ No newline at end of file
+    """
+
+# ---------- Batch ----------
+# Ejecuta varias llamadas en un solo round-trip: cada sub-request se despacha
+# directamente a la app ASGI (sin red) y las independientes corren en paralelo.
+
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "10"))
+BATCH_MAX_REQUESTS = 100
+# el cuerpo de cada sub-respuesta se guarda en memoria, así que se limita su tamaño
+BATCH_MAX_RESPONSE_BYTES = int(os.environ.get("BATCH_MAX_RESPONSE_BYTES", str(1024 * 1024)))
+
+
+class SubRequest(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(pattern=r"^/", examples=["/store/1"])
+    query: dict[str, Any] = {}
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest] = Field(max_length=BATCH_MAX_REQUESTS)
+    max_concurrency: int = Field(BATCH_MAX_CONCURRENCY, gt=0, le=BATCH_MAX_CONCURRENCY)
+
+
+class SubResponse(BaseModel):
+    status_code: int
+    body: Any = None
+    elapsed_ms: float
+
+
+class BatchResponse(BaseModel):
+    responses: list[SubResponse]
+    elapsed_ms: float
+
+
+async def dispatch_subrequest(sub: SubRequest, headers: list[tuple[bytes, bytes]]) -> SubResponse:
+    path, _, raw_query = sub.path.partition("?")
+    query = "&".join(q for q in (raw_query, urlencode(sub.query, doseq=True)) if q)
+    body = b"" if sub.body is None else json.dumps(jsonable_encoder(sub.body)).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": sub.method,
+        "scheme": "http",
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": headers + [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": None,
+        "server": None,
+        "state": {"in_batch": True},
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    status_code = 500
+    content_type = b""
+    chunks = []
+    size = 0
+    too_large = False
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # no hay cliente real que se desconecte: se espera hasta que la respuesta termine
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status_code, content_type, size, too_large
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > BATCH_MAX_RESPONSE_BYTES:
+                # se corta la respuesta (ej. /store/export) en vez de cargarla entera
+                too_large = True
+                raise RuntimeError("Sub-response too large")
+            chunks.append(chunk)
+
+    start = perf_counter()
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        status_code = 500  # ServerErrorMiddleware ya respondió, pero vuelve a lanzar el error
+    elapsed_ms = round((perf_counter() - start) * 1000, 3)
+
+    if too_large:
+        detail = f"Sub-response exceeds {BATCH_MAX_RESPONSE_BYTES} bytes"
+        return SubResponse(status_code=413, body={"detail": detail}, elapsed_ms=elapsed_ms)
+
+    content = b"".join(chunks)
+    if content and content_type.startswith(b"application/json"):
+        result = json.loads(content)
+    else:
+        result = content.decode("utf-8", errors="replace") or None
+    return SubResponse(status_code=status_code, body=result, elapsed_ms=elapsed_ms)
+
+
+@app.post("/batch", response_model=BatchResponse)
+async def batch(batch_in: BatchRequest, request: Request):
+    # las sub-requests llevan esta marca en el scope, así no importa cómo se escriba la ruta
+    if request.scope.get("state", {}).get("in_batch"):
+        raise HTTPException(status_code=400, detail="Nested batch requests are not allowed")
+    # se reenvían las cabeceras del cliente (cookies, auth...) salvo las del cuerpo
+    headers = [
+        (name, value) for name, value in request.scope["headers"]
+        if name not in (b"content-type", b"content-length")
+    ]
+    semaphore = asyncio.Semaphore(batch_in.max_concurrency)
+    responses = [None] * len(batch_in.requests)
+
+    async def run(index: int, sub: SubRequest):
+        async with semaphore:
+            responses[index] = await dispatch_subrequest(sub, headers)
+
+    # Los GET seguidos corren en paralelo. Un POST/PUT/PATCH/DELETE es una barrera:
+    # espera a todo lo anterior y corre solo, así las lecturas que vienen después ven su efecto.
+    start = perf_counter()
+    reads = []
+    for index, sub in enumerate(batch_in.requests):
+        if sub.method == "GET":
+            reads.append(run(index, sub))
+        else:
+            await asyncio.gather(*reads)
+            reads = []
+            await run(index, sub)
+    await asyncio.gather(*reads)
+    return {"responses": responses, "elapsed_ms": round((perf_counter() - start) * 1000, 3)}
@@ -0,0 +1,395 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import queue
+import sys
+import threading
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TransactionTestCase
+from fastapi.testclient import TestClient
+
+from store.models import Item
+from f_api import main
+from f_api.main import (
+    BATCH_MAX_CONCURRENCY,
+    BoundedQueueHandler,
+    JsonFormatter,
+    StoreFormat,
+    app,
+    pa,
+    parse_sample_rates,
+    pq,
+)
+
+# Create your tests here.
+
+
+class QuietLogsMixin:
+    # cada request escribiría su access log en stdout y taparía la salida de los tests
+    def setUp(self):
+        super().setUp()
+        for logger in (main.logger, main.access_logger):
+            patcher = mock.patch.object(logger, "disabled", True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class StoreExportImportTests(QuietLogsMixin, TransactionTestCase):
+    # TransactionTestCase: las rutas síncronas corren en otro hilo con su propia conexión
+
+    def setUp(self):
+        super().setUp()
+        self.client = TestClient(app)
+        Item.objects.bulk_create([
+            Item(name=f"item {i}", description=None if i % 2 else 'con "comillas", y\nsalto', price=i, tax=0.19)
+            for i in range(12000)
+        ])
+
+    def import_file(self, content, store_format=StoreFormat.csv):
+        return self.client.post("/store/import", params={"format": store_format.value}, files={"file": ("f", content)})
+
+    def import_lines(self, content, store_format=StoreFormat.csv):
+        response = self.import_file(content, store_format)
+        self.assertEqual(response.status_code, 200, response.text)
+        return [json.loads(line) for line in response.iter_lines()]
+
+    def test_round_trip_all_formats(self):
+        expected = sorted(Item.objects.values_list("name", "description", "price", "tax"))
+        for store_format in StoreFormat:
+            with self.subTest(store_format=store_format.value):
+                exported = self.client.get("/store/export", params={"format": store_format.value})
+                self.assertEqual(exported.status_code, 200)
+                Item.objects.all().delete()
+
+                lines = self.import_lines(exported.content, store_format)
+                self.assertEqual([line["imported"] for line in lines[:-1]], [5000, 10000, 12000])
+                self.assertEqual(lines[-1]["status"], "done")
+                self.assertEqual(lines[-1]["imported"], len(expected))
+                self.assertEqual(lines[-1]["batches"], 3)
+                self.assertEqual(sorted(Item.objects.values_list("name", "description", "price", "tax")), expected)
+
+    def test_export_reads_cursor_on_one_thread(self):
+        iter_store_rows = main.iter_store_rows
+        threads = set()
+
+        def tracking_rows():
+            for row in iter_store_rows():
+                threads.add(threading.current_thread().name)
+                yield row
+
+        with mock.patch.object(main, "iter_store_rows", tracking_rows):
+            response = self.client.get("/store/export", params={"format": "ndjson"})
+        self.assertEqual(len(response.text.splitlines()), 12000)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith("store-export"))
+
+    def test_export_csv_header_only_when_empty(self):
+        Item.objects.all().delete()
+        response = self.client.get("/store/export")
+        self.assertEqual(list(csv.reader(io.StringIO(response.text))), [["id", "name", "description", "price", "tax"]])
+
+    def assert_import_error(self, content, store_format, row):
+        Item.objects.all().delete()
+        response = self.import_file(content, store_format)
+        self.assertEqual(response.status_code, 422, response.text)
+        self.assertEqual(response.json()["detail"]["row"], row)
+        self.assertEqual(response.json()["detail"]["imported"], 0)
+
+    def test_import_invalid_value(self):
+        self.assert_import_error(b"name,price,tax\nfoo,1,1\nbar,abc,1\n", StoreFormat.csv, 2)
+
+    def test_import_error_after_first_batch(self):
+        # el 200 ya se envió: el error llega como última línea del stream
+        Item.objects.all().delete()
+        content = "name,price,tax\n" + "a,1,1\n" * main.STORE_BATCH_SIZE + "a,1,1\nb,abc,1\n"
+        lines = self.import_lines(content.encode())
+        self.assertEqual(lines[0], {"status": "progress", "batch": 1, "imported": 5000, "rows_per_second": mock.ANY})
+        self.assertEqual(
+            lines[-1],
+            {"status": "error", "row": main.STORE_BATCH_SIZE + 2, "imported": main.STORE_BATCH_SIZE, "error": mock.ANY},
+        )
+        self.assertEqual(Item.objects.count(), main.STORE_BATCH_SIZE)
+
+    def test_import_invalid_ndjson(self):
+        content = json.dumps({"name": "foo", "price": 1, "tax": 1}).encode() + b"\nnot json\n"
+        self.assert_import_error(content, StoreFormat.ndjson, 2)
+
+    def test_import_invalid_utf8(self):
+        self.assert_import_error(b"name,price,tax\n\xff\xfe,1,1\n", StoreFormat.csv, 1)
+
+    def test_import_invalid_parquet(self):
+        if pa is None:
+            self.skipTest("pyarrow is not installed")
+        self.assert_import_error(b"not a parquet file", StoreFormat.parquet, 1)
+
+    def test_import_parquet_missing_price(self):
+        if pa is None:
+            self.skipTest("pyarrow is not installed")
+        table = pa.table({"name": ["a", "b"], "description": [None, None], "price": [1.0, None], "tax": [0.0, 0.0]})
+        sink = io.BytesIO()
+        pq.write_table(table, sink)
+        self.assert_import_error(sink.getvalue(), StoreFormat.parquet, 2)
+
+    def columnar_file(self, store_format, columns):
+        table = pa.table(columns)
+        sink = io.BytesIO()
+        if store_format is StoreFormat.parquet:
+            pq.write_table(table, sink)
+        else:
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        return sink.getvalue()
+
+    def test_import_rejects_values_the_table_cannot_store(self):
+        long_name = "x" * 101
+        self.assert_import_error(b"name,price,tax\na,1,1\nb,nan,1\n", StoreFormat.csv, 2)
+        self.assert_import_error(b"name,price,tax\na,1,inf\n", StoreFormat.csv, 1)
+        self.assert_import_error(f"name,price,tax\n{long_name},1,1\n".encode(), StoreFormat.csv, 1)
+        if pa is None:
+            return
+        for store_format in (StoreFormat.parquet, StoreFormat.arrow):
+            with self.subTest(store_format=store_format.value):
+                content = self.columnar_file(store_format, {"name": ["a", "b"], "price": [1.0, float("nan")], "tax": [0.0, 0.0]})
+                self.assert_import_error(content, store_format, 2)
+                content = self.columnar_file(store_format, {"name": ["a", long_name], "price": [1.0, 2.0], "tax": [0.0, 0.0]})
+                self.assert_import_error(content, store_format, 2)
+                content = self.columnar_file(store_format, {"name": ["a"], "tax": [0.0]})
+                self.assert_import_error(content, store_format, 1)
+
+    def test_import_without_description(self):
+        Item.objects.all().delete()
+        content = b'{"name": "a", "price": 1, "tax": 0}\n{"name": "b", "price": 2, "tax": 0, "description": "d"}\n'
+        response = self.import_file(content, StoreFormat.ndjson)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(sorted(Item.objects.values_list("name", "description")), [("a", None), ("b", "d")])
+        if pa is None:
+            return
+        for store_format in (StoreFormat.parquet, StoreFormat.arrow):
+            with self.subTest(store_format=store_format.value):
+                Item.objects.all().delete()
+                content = self.columnar_file(store_format, {"name": ["a"], "price": [1.0], "tax": [0.0]})
+                response = self.import_file(content, store_format)
+                self.assertEqual(response.status_code, 200, response.text)
+                self.assertEqual(list(Item.objects.values_list("name", "description")), [("a", None)])
+
+    def test_import_database_error(self):
+        Item.objects.all().delete()
+        content = "name,price,tax\n" + "a,1,1\n" * (main.STORE_BATCH_SIZE + 1)
+        insert_rows = main.insert_rows
+        calls = []
+
+        def fail_second_batch(rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise DatabaseError("boom")
+            insert_rows(rows)
+
+        with mock.patch.object(main, "insert_rows", fail_second_batch):
+            lines = self.import_lines(content.encode())
+        self.assertEqual(
+            lines[-1],
+            {"status": "error", "row": main.STORE_BATCH_SIZE + 1, "imported": main.STORE_BATCH_SIZE, "error": "boom"},
+        )
+
+        Item.objects.all().delete()
+        with mock.patch.object(main, "insert_rows", side_effect=DatabaseError("boom")):
+            response = self.import_file(content.encode())
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"], {"row": 1, "imported": 0, "error": "boom"})
+
+
+class BatchTests(QuietLogsMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = TestClient(app)
+        self.item = Item.objects.create(name="Foo", price=10, tax=1)
+
+    def batch(self, requests, **kwargs):
+        return self.client.post("/batch", json={"requests": requests, **kwargs})
+
+    def test_responses_keep_order(self):
+        response = self.batch([
+            {"path": f"/store/{self.item.pk}"},
+            {"path": "/store/0"},
+            {"path": "/models/Camila"},
+            {"path": "/items/5", "query": {"q": "x", "size": 2}},
+            {"method": "POST", "path": "/store/", "body": {"name": "Bar", "price": 3, "tax": 0}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        responses = response.json()["responses"]
+        self.assertEqual([r["status_code"] for r in responses], [200, 404, 200, 200, 201])
+        self.assertEqual(responses[0]["body"]["name"], "Foo")
+        self.assertEqual(responses[1]["body"], {"detail": "Item not found"})
+        self.assertEqual(responses[2]["body"]["message"], "Camila está disponible")
+        self.assertEqual(responses[3]["body"], {"item_id": 5, "q": "x", "size": 2.0})
+        self.assertEqual(responses[4]["body"]["name"], "Bar")
+        self.assertTrue(all(r["elapsed_ms"] >= 0 for r in responses))
+
+    def test_writes_are_barriers(self):
+        def create(name):
+            return {"method": "POST", "path": "/store/", "body": {"name": name, "price": 1, "tax": 0}}
+
+        responses = self.batch([
+            {"path": "/store/"},
+            create("Bar"),
+            {"path": "/store/"},
+            {"path": "/suma_store/"},
+            create("Baz"),
+            {"path": "/store/"},
+        ]).json()["responses"]
+        names = [[item["name"] for item in responses[i]["body"]] for i in (0, 2, 5)]
+        self.assertEqual(names, [["Foo"], ["Foo", "Bar"], ["Foo", "Bar", "Baz"]])
+        self.assertEqual(responses[3]["body"], {"total_price": 11.0})
+
+    def test_reads_run_concurrently(self):
+        active = 0
+        peak = 0
+        dispatch = main.dispatch_subrequest
+
+        async def tracking_dispatch(sub, headers):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            try:
+                return await dispatch(sub, headers)
+            finally:
+                active -= 1
+
+        reads = [{"path": "/"}] * 6
+        with mock.patch.object(main, "dispatch_subrequest", tracking_dispatch):
+            self.batch(reads + [{"method": "POST", "path": "/status/items/", "query": {"name": "x"}}] + reads,
+                       max_concurrency=3)
+        self.assertEqual(peak, 3)
+
+        peak = 0
+        with mock.patch.object(main, "dispatch_subrequest", tracking_dispatch):
+            self.batch([{"method": "POST", "path": "/status/items/", "query": {"name": "x"}}] * 4)
+        self.assertEqual(peak, 1)
+
+    def test_failing_subrequest_returns_500(self):
+        responses = self.batch([{"path": "/encode/items/nope"}, {"path": "/"}]).json()["responses"]
+        self.assertEqual([r["status_code"] for r in responses], [500, 200])
+
+    def test_max_concurrency_above_cap(self):
+        response = self.batch([{"path": "/"}], max_concurrency=BATCH_MAX_CONCURRENCY + 1)
+        self.assertEqual(response.status_code, 422)
+
+    def test_nested_batch_rejected(self):
+        nested = {"requests": [{"path": "/"}]}
+        responses = self.batch([
+            {"method": "POST", "path": "/batch", "body": nested},
+            {"method": "POST", "path": "/%62atch", "body": nested},
+        ]).json()["responses"]
+        self.assertEqual([r["status_code"] for r in responses], [400, 400])
+
+    def test_large_subresponse_rejected(self):
+        Item.objects.bulk_create([Item(name=f"item {i}", price=i, tax=0) for i in range(1000)])
+        with mock.patch.object(main, "BATCH_MAX_RESPONSE_BYTES", 1024):
+            responses = self.batch([{"path": "/store/export"}, {"path": "/"}]).json()["responses"]
+        self.assertEqual([r["status_code"] for r in responses], [413, 200])
+
+
+class LoggingTests(SimpleTestCase):
+    def make_record(self, msg="hola %s", args=("mundo",), **extra):
+        return logging.makeLogRecord({"name": "f_api", "levelno": logging.INFO, "levelname": "INFO",
+                                      "msg": msg, "args": args, **extra})
+
+    def test_json_formatter(self):
+        handler = BoundedQueueHandler(queue.Queue())
+        record = handler.prepare(self.make_record(fields={"status_code": 200}))
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "hola mundo")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["status_code"], 200)
+
+    def test_json_formatter_exception(self):
+        try:
+            raise KeyError("nope")
+        except KeyError:
+            record = self.make_record(exc_info=sys.exc_info())
+        entry = json.loads(JsonFormatter().format(BoundedQueueHandler(queue.Queue()).prepare(record)))
+        self.assertIn("KeyError: 'nope'", entry["exc_info"])
+
+    def test_drop_policy_counts_dropped(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        for _ in range(5):
+            handler.handle(self.make_record())
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+    def test_block_policy_waits_for_space(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block=True)
+        handler.handle(self.make_record())
+        writer = threading.Thread(target=handler.handle, args=(self.make_record(),))
+        writer.start()
+        writer.join(0.1)
+        self.assertTrue(writer.is_alive())  # bloqueado con la cola llena
+        handler.queue.get()
+        writer.join(1)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(handler.dropped, 0)
+
+    def test_parse_sample_rates(self):
+        self.assertEqual(parse_sample_rates(""), {})
+        self.assertEqual(
+            parse_sample_rates("/items/{item_id}=0.1, /models/{model_name}=2,/a=b=-1"),
+            {"/items/{item_id}": 0.1, "/models/{model_name}": 1.0, "/a=b": 0.0},
+        )
+
+    def test_sampling_keeps_server_errors(self):
+        with mock.patch.object(main, "LOG_SAMPLE_RATES", {"/": 0.0}):
+            self.assertFalse(main.should_log_access("/", 200))
+            self.assertTrue(main.should_log_access("/", 500))
+            self.assertTrue(main.should_log_access("/models/{model_name}", 200))
+
+    def test_access_log_on_unhandled_exception(self):
+        client = TestClient(app, raise_server_exceptions=False)
+        with mock.patch.object(main.access_logger, "info") as log:
+            response = client.get("/encode/items/nope")
+        self.assertEqual(response.status_code, 500)
+        fields = log.call_args.kwargs["extra"]["fields"]
+        self.assertEqual((fields["route"], fields["status_code"]), ("/encode/items/{item_id}", 500))
+
+
+class AccessLogMiddlewareTests(SimpleTestCase):
+    def run_app(self, inner):
+        scope = {"type": "http", "method": "GET", "path": "/slow", "client": ("10.0.0.1", 1234)}
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        with mock.patch.object(main.access_logger, "info") as log:
+            try:
+                asyncio.run(main.AccessLogMiddleware(inner)(scope, receive, send))
+            except RuntimeError:
+                pass
+        self.assertEqual(log.call_count, 1)
+        return log.call_args.kwargs["extra"]["fields"]
+
+    def test_logged_when_body_finishes(self):
+        async def streaming(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"a", "more_body": True})
+            await asyncio.sleep(0.05)
+            await send({"type": "http.response.body", "body": b"b", "more_body": False})
+
+        fields = self.run_app(streaming)
+        self.assertEqual(fields["status_code"], 200)
+        self.assertGreaterEqual(fields["duration_ms"], 50)
+        self.assertEqual(fields["client"], "10.0.0.1")
+
+    def test_stream_cut_off_logged_as_error(self):
+        async def broken(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"a", "more_body": True})
+            raise RuntimeError("cut off")
+
+        self.assertEqual(self.run_app(broken)["status_code"], 500)
@@ -1,3 +1,165 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.options import IncorrectLookupParameters, get_content_type_for_model
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import F, Max
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from .models import Item
 
 # Register your models here.
+
+CURSOR_VAR = "after"
+COUNT_LIMIT = 10000
+
+
+def estimated_count(model):
+    # Estimación barata del total de filas, sin recorrer la tabla con COUNT(*)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    # en el resto de motores el máximo de la PK sale directo del índice
+    return model._default_manager.aggregate(total=Max("pk"))["total"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return estimated_count(self.object_list.model)
+        # con búsqueda o filtros se cuenta como mucho COUNT_LIMIT filas
+        return self.object_list.order_by()[:COUNT_LIMIT].count()
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList paginada por cursor (?after=<pk>) en vez de OFFSET."""
+
+    def __init__(self, request, *args, **kwargs):
+        try:
+            self.cursor = int(request.GET[CURSOR_VAR]) if CURSOR_VAR in request.GET else None
+        except ValueError:
+            raise IncorrectLookupParameters
+        super().__init__(request, *args, **kwargs)
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        # el cursor filtra por pk, así que ?o= no puede cambiar el orden
+        return ["-pk"]
+
+    def get_query_string(self, new_params=None, remove=None):
+        # ordenar, filtrar o buscar siempre vuelve a la primera página
+        new_params = new_params or {}
+        if CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.cursor is not None:
+            queryset = queryset.filter(pk__lt=self.cursor)
+        page = list(queryset[: self.list_per_page + 1])
+
+        self.result_list = page[: self.list_per_page]
+        self.next_cursor = self.result_list[-1].pk if len(page) > self.list_per_page else None
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = self.cursor is not None or self.next_cursor is not None
+        self.paginator = paginator
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string()
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+
+@admin.register(Item)
+class ItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "price", "tax")
+    list_per_page = 100
+    list_select_related = False  # Item no tiene relaciones
+    ordering = ("-pk",)  # la paginación por cursor depende de este orden
+    sortable_by = ()
+    search_fields = ("name",)
+    search_help_text = "Busca por el inicio del nombre (distingue mayúsculas)"
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ("apply_discount", "clear_tax", "delete_selected_items")
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_queryset(self, request):
+        # description es un TextField y no se muestra en el listado
+        return super().get_queryset(request).only(*self.list_display)
+
+    def get_search_results(self, request, queryset, search_term):
+        # búsqueda por prefijo como rango, así usa el índice de name en cualquier motor
+        if not search_term:
+            return queryset, False
+        return queryset.filter(name__gte=search_term, name__lt=search_term + "\U0010ffff"), False
+
+    def get_actions(self, request):
+        # delete_selected carga cada objeto para la confirmación; se reemplaza por delete_selected_items
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(description="Aplicar 10%% de descuento a los items seleccionados", permissions=["change"])
+    def apply_discount(self, request, queryset):
+        updated = queryset.update(price=F("price") * 0.9)
+        self.message_user(request, f"{updated} items actualizados.")
+
+    @admin.action(description="Poner el impuesto en 0", permissions=["change"])
+    def clear_tax(self, request, queryset):
+        updated = queryset.update(tax=0)
+        self.message_user(request, f"{updated} items actualizados.")
+
+    @admin.action(description="Borrar los items seleccionados", permissions=["delete"])
+    def delete_selected_items(self, request, queryset):
+        # Mismo flujo que delete_selected (confirmación y LogEntry) sin cargar los objetos:
+        # Item no tiene relaciones ni señales, así que Django lo borra con un solo DELETE
+        if request.POST.get("post") == "yes":
+            deleted, _ = queryset.delete()
+            LogEntry.objects.create(
+                user_id=request.user.pk,
+                content_type_id=get_content_type_for_model(self.model).pk,
+                object_repr=f"{deleted} items",
+                action_flag=DELETION,
+                change_message=f"Borrado masivo de {deleted} items desde el admin.",
+            )
+            self.message_user(request, f"{deleted} items borrados.")
+            return None
+
+        # con "seleccionar todo" y sin búsqueda se usa la estimación, no un COUNT(*) de la tabla
+        estimated = not queryset.query.where
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "¿Está seguro?",
+            "opts": self.model._meta,
+            "count": estimated_count(self.model) if estimated else queryset.count(),
+            "estimated": estimated,
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, "admin/store/item/delete_selected_confirmation.html", context)
@@ -1,3 +1,144 @@
+import os
+from time import perf_counter
+
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .admin import CURSOR_VAR
+from .models import Item
 
 # Create your tests here.
+
+ADMIN_TEST_ROWS = int(os.environ.get("ADMIN_TEST_ROWS", "1000000"))
+PAGE_LOAD_LIMIT = 1.0  # segundos
+
+
+class ItemAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # executemany directo: bulk_create de 1M de objetos tarda demasiado
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {Item._meta.db_table} (name, description, price, tax) VALUES (%s, %s, %s, %s)",
+                ((f"item {i:07d}", "x" * 200, i % 1000, 0.19) for i in range(ADMIN_TEST_ROWS)),
+            )
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.url = reverse("admin:store_item_changelist")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def timed_get(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = self.client.get(self.url, params or {})
+            elapsed = perf_counter() - start
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(elapsed, PAGE_LOAD_LIMIT)
+        for query in queries.captured_queries:
+            sql = query["sql"].upper()
+            self.assertNotIn("OFFSET", sql)
+            if sql.startswith("SELECT COUNT(*)"):
+                self.assertIn("LIMIT", sql)  # solo se permiten conteos acotados
+        return response
+
+    def test_changelist_first_and_next_page(self):
+        response = self.timed_get()
+        cl = response.context["cl"]
+        self.assertEqual(len(cl.result_list), cl.list_per_page)
+        self.assertEqual(cl.result_list[0].pk, ADMIN_TEST_ROWS)
+
+        response = self.timed_get({CURSOR_VAR: cl.next_cursor})
+        next_cl = response.context["cl"]
+        self.assertEqual(next_cl.result_list[0].pk, cl.next_cursor - 1)
+
+    def test_changelist_deep_page(self):
+        response = self.timed_get({CURSOR_VAR: 50})
+        self.assertEqual([item.pk for item in response.context["cl"].result_list], list(range(49, 0, -1)))
+        self.assertIsNone(response.context["cl"].next_cursor)
+
+    def test_search_by_name_prefix(self):
+        response = self.timed_get({"q": "item 000012"})
+        self.assertEqual(
+            sorted(item.name for item in response.context["cl"].result_list),
+            [f"item {i:07d}" for i in range(120, 130)],
+        )
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {CURSOR_VAR: "abc"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_bulk_actions_run_single_statement(self):
+        selected = [str(pk) for pk in range(1, 11)]
+        for action, verb, extra in (
+            ("clear_tax", "UPDATE", {}),
+            ("delete_selected_items", "DELETE", {"post": "yes"}),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, {"action": action, "_selected_action": selected, **extra})
+            statements = [q["sql"] for q in queries.captured_queries if q["sql"].startswith(verb)]
+            self.assertEqual(len(statements), 1, statements)
+        self.assertFalse(Item.objects.filter(pk__lte=10).exists())
+
+    def test_delete_asks_for_confirmation(self):
+        selected = [str(pk) for pk in range(1, 11)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"action": "delete_selected_items", "_selected_action": selected})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "admin/store/item/delete_selected_confirmation.html")
+        self.assertEqual(response.context["count"], 10)
+        self.assertFalse(any(q["sql"].startswith("DELETE") for q in queries.captured_queries))
+        self.assertEqual(Item.objects.filter(pk__lte=10).count(), 10)
+
+        response = self.client.post(
+            self.url, {"action": "delete_selected_items", "_selected_action": selected, "post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Item.objects.filter(pk__lte=10).exists())
+        entry = LogEntry.objects.get()
+        self.assertEqual((entry.action_flag, entry.object_repr, entry.user), (DELETION, "10 items", self.user))
+
+    def test_delete_select_across(self):
+        # sin búsqueda la confirmación muestra la estimación, sin COUNT(*) de la tabla
+        data = {"action": "delete_selected_items", "_selected_action": ["1"], "select_across": "1"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.context["count"], ADMIN_TEST_ROWS)
+        self.assertTrue(response.context["estimated"])
+        self.assertFalse(any(q["sql"].upper().startswith("SELECT COUNT(*)") for q in queries.captured_queries))
+
+        # con búsqueda se borra todo lo filtrado, no solo la página
+        url = f"{self.url}?q=item+000012"
+        response = self.client.post(url, data)
+        self.assertEqual(response.context["count"], 10)
+        self.client.post(url, {**data, "post": "yes"})
+        self.assertFalse(Item.objects.filter(name__startswith="item 000012").exists())
+        self.assertEqual(Item.objects.count(), ADMIN_TEST_ROWS - 10)
+        self.assertEqual(LogEntry.objects.get().object_repr, "10 items")
+
+
+class ItemAdminKeysetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Item.objects.bulk_create([Item(name=f"item {i % 7}", price=i, tax=0) for i in range(250)])
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        cls.url = reverse("admin:store_item_changelist")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_order_param_does_not_break_cursor(self):
+        seen = []
+        params = {"o": "2"}
+        while True:
+            cl = self.client.get(self.url, params).context["cl"]
+            seen.extend(item.pk for item in cl.result_list)
+            if cl.next_cursor is None:
+                break
+            params[CURSOR_VAR] = cl.next_cursor
+        self.assertEqual(sorted(seen), sorted(Item.objects.values_list("pk", flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))